@@ -47,6 +47,40 @@ _AGENT_STOP_FLAGS = {}
 _BROWSER_AGENT_INSTANCES = {}
 
 
+def _create_browser(browser_config: Dict[str, Any]) -> CustomBrowser:
+    """Builds a (not yet launched) CustomBrowser from the agent's browser config dict."""
+    # These should ideally come from the main agent's config
+    headless = browser_config.get("headless", False)
+    window_w = browser_config.get("window_width", 1280)
+    window_h = browser_config.get("window_height", 1100)
+    browser_user_data_dir = browser_config.get("user_data_dir", None)
+    use_own_browser = browser_config.get("use_own_browser", False)
+    browser_binary_path = browser_config.get("browser_binary_path", None)
+    wss_url = browser_config.get("wss_url", None)
+    cdp_url = browser_config.get("cdp_url", None)
+
+    extra_args = [f"--window-size={window_w},{window_h}"]
+    if use_own_browser:
+        browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
+        if browser_binary_path == "":
+            browser_binary_path = None
+        browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
+        if browser_user_data:
+            extra_args += [f"--user-data-dir={browser_user_data}"]
+    else:
+        browser_binary_path = None
+
+    return CustomBrowser(
+        config=BrowserConfig(
+            headless=headless,
+            browser_binary_path=browser_binary_path,
+            extra_browser_args=extra_args,
+            wss_url=wss_url,
+            cdp_url=cdp_url,
+        )
+    )
+
+
 async def run_single_browser_task(
         task_query: str,
         task_id: str,
@@ -54,10 +88,14 @@ async def run_single_browser_task(
         browser_config: Dict[str, Any],
         stop_event: threading.Event,
         use_vision: bool = False,
+        controller: Optional[CustomController] = None,
+        browser: Optional[CustomBrowser] = None,
 ) -> Dict[str, Any]:
     """
     Runs a single BrowserUseAgent task.
-    Manages browser creation and closing for this specific task.
+    Manages browser creation and closing for this specific task, unless a shared browser is
+    passed in, in which case only the task's own context is created and closed.
+    A controller shared between concurrent tasks may be passed in; otherwise one is created.
     """
     if not BrowserUseAgent:
         return {
@@ -65,53 +103,32 @@ async def run_single_browser_task(
             "error": "BrowserUseAgent components not available.",
         }
 
-    # --- Browser Setup ---
-    # These should ideally come from the main agent's config
-    headless = browser_config.get("headless", False)
     window_w = browser_config.get("window_width", 1280)
     window_h = browser_config.get("window_height", 1100)
-    browser_user_data_dir = browser_config.get("user_data_dir", None)
-    use_own_browser = browser_config.get("use_own_browser", False)
-    browser_binary_path = browser_config.get("browser_binary_path", None)
-    wss_url = browser_config.get("wss_url", None)
-    cdp_url = browser_config.get("cdp_url", None)
-    disable_security = browser_config.get("disable_security", False)
 
+    # Return early if a stop was requested while queued; the browser itself only launches inside run()
+    if stop_event.is_set():
+        logger.info(f"Browser task for '{task_query}' cancelled before start.")
+        return {"query": task_query, "result": None, "status": "cancelled"}
+
+    owns_browser = browser is None
     bu_browser = None
     bu_browser_context = None
+    task_key = None
     try:
         logger.info(f"Starting browser task for query: {task_query}")
-        extra_args = [f"--window-size={window_w},{window_h}"]
-        if use_own_browser:
-            browser_binary_path = os.getenv("BROWSER_PATH", None) or browser_binary_path
-            if browser_binary_path == "":
-                browser_binary_path = None
-            browser_user_data = browser_user_data_dir or os.getenv("BROWSER_USER_DATA", None)
-            if browser_user_data:
-                extra_args += [f"--user-data-dir={browser_user_data}"]
-        else:
-            browser_binary_path = None
-
-        bu_browser = CustomBrowser(
-            config=BrowserConfig(
-                headless=headless,
-                browser_binary_path=browser_binary_path,
-                extra_browser_args=extra_args,
-                wss_url=wss_url,
-                cdp_url=cdp_url,
-            )
-        )
+        bu_browser = browser or _create_browser(browser_config)
 
         context_config = BrowserContextConfig(
             save_downloads_path="./tmp/downloads",
             window_height=window_h,
             window_width=window_w,
+            # Never fall back to browser.contexts[0], which a sibling task's close() would tear down
             force_new_context=True,
         )
         bu_browser_context = await bu_browser.new_context(config=context_config)
 
-        # Simple controller example, replace with your actual implementation if needed
-        bu_controller = CustomController()
+        bu_controller = controller or CustomController()
 
         # Construct the task prompt for BrowserUseAgent
         # Instruct it to find specific info and return title/URL
@@ -142,11 +159,8 @@ async def run_single_browser_task(
 
         # --- Run with Stop Check ---
         # BrowserUseAgent needs to internally check a stop signal or have a stop method.
-        # We simulate checking before starting and assume `run` might be interruptible
-        # or have its own stop mechanism we can trigger via bu_agent_instance.stop().
-        if stop_event.is_set():
-            logger.info(f"Browser task for '{task_query}' cancelled before start.")
-            return {"query": task_query, "result": None, "status": "cancelled"}
+        # The stop event is checked before setup; `run` (which lazily launches the browser) is
+        # assumed to be interruptible via bu_agent_instance.stop().
 
         # The run needs to be awaitable and ideally accept a stop signal or have a .stop() method
         # result = await bu_agent_instance.run(max_steps=max_steps) # Add max_steps if applicable
@@ -177,7 +191,7 @@ async def run_single_browser_task(
                 logger.info("Closed browser context.")
             except Exception as e:
                 logger.error(f"Error closing browser context: {e}")
-        if bu_browser:
+        if bu_browser and owns_browser:
             try:
                 await bu_browser.close()
                 bu_browser = None
@@ -185,7 +199,7 @@ async def run_single_browser_task(
             except Exception as e:
                 logger.error(f"Error closing browser: {e}")
 
-        if task_key in _BROWSER_AGENT_INSTANCES:
+        if task_key and task_key in _BROWSER_AGENT_INSTANCES:
             del _BROWSER_AGENT_INSTANCES[task_key]
 
 
@@ -208,14 +222,33 @@ async def _run_browser_search_tool(
     Handles concurrency and stop signals.
     """
 
+    # Drop repeated queries (keeping order) so each browser slot does distinct work
+    unique_queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if len(unique_queries) < len(queries):
+        logger.info(
+            f"[Browser Tool {task_id}] Deduplicated {len(queries)} queries to {len(unique_queries)}."
+        )
     # Limit queries just in case LLM ignores the description
-    queries = queries[:max_parallel_browsers]
+    queries = unique_queries[:max_parallel_browsers]
     logger.info(
         f"[Browser Tool {task_id}] Running search for {len(queries)} queries: {queries}"
     )
 
     results = []
     semaphore = asyncio.Semaphore(max_parallel_browsers)
+    # The controller's action registry is stateless per call, so one instance serves all queries
+    controller = CustomController()
+    # Launch one browser for the whole batch, giving each query its own context. Only share a
+    # browser launched here: with cdp_url/wss_url or an own browser binary, contexts can end up
+    # backed by the user's existing default context, so those modes keep one browser per query.
+    builtin_launch = not (
+            browser_config.get("use_own_browser", False)
+            or browser_config.get("cdp_url")
+            or browser_config.get("wss_url")
+    )
+    shared_browser = None
+    if len(queries) > 1 and builtin_launch and not stop_event.is_set():
+        shared_browser = _create_browser(browser_config)
 
     async def task_wrapper(query):
         async with semaphore:
@@ -225,25 +258,44 @@ async def _run_browser_search_tool(
                 )
                 return {"query": query, "result": None, "status": "cancelled"}
             # Pass necessary injected configs and the stop event
-            return await run_single_browser_task(
-                query,
-                task_id,
-                llm,  # Pass the main LLM (or a dedicated one if needed)
-                browser_config,
-                stop_event,
-                # use_vision could be added here if needed
-            )
+            try:
+                return await run_single_browser_task(
+                    query,
+                    task_id,
+                    llm,  # Pass the main LLM (or a dedicated one if needed)
+                    browser_config,
+                    stop_event,
+                    # use_vision could be added here if needed
+                    controller=controller,
+                    browser=shared_browser,
+                )
+            except Exception as e:
+                # Return instead of raising so one failed query doesn't abort its siblings in the group
+                return e
 
-    tasks = [task_wrapper(query) for query in queries]
-    search_results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        if shared_browser:
+            # Launch up front so concurrent contexts don't race to start the browser
+            await shared_browser.get_playwright_browser()
+        # The task group ties the browser tasks to this call: cancelling the search cancels them all
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(task_wrapper(query)) for query in queries]
+        search_results = [task.result() for task in tasks]
+    finally:
+        if shared_browser:
+            try:
+                await shared_browser.close()
+                logger.info(f"[Browser Tool {task_id}] Closed shared browser.")
+            except Exception as e:
+                logger.error(f"[Browser Tool {task_id}] Error closing shared browser: {e}")
 
     processed_results = []
     for i, res in enumerate(search_results):
         query = queries[i]  # Get corresponding query
         if isinstance(res, Exception):
             logger.error(
-                f"[Browser Tool {task_id}] Gather caught exception for query '{query}': {res}",
-                exc_info=True,
+                f"[Browser Tool {task_id}] Caught exception for query '{query}': {res}",
+                exc_info=res,
             )
             processed_results.append(
                 {"query": query, "error": str(res), "status": "failed"}
@@ -468,7 +520,7 @@ async def planning_node(state: DeepResearchState) -> Dict[str, Any]:
     if existing_plan and (
             state.get("current_category_index", 0) > 0 or state.get("current_task_index_in_category", 0) > 0):
         logger.info("Resuming with existing plan.")
-        _save_plan_to_md(existing_plan, output_dir)  # Ensure it's saved initially
+        await asyncio.to_thread(_save_plan_to_md, existing_plan, output_dir)  # Ensure it's saved initially
         # current_category_index and current_task_index_in_category should be set by _load_previous_state
         return {"research_plan": existing_plan}
 
@@ -585,7 +637,7 @@ Ensure the output is a valid JSON array.
             return {"error_message": "Failed to generate research plan structure."}
 
         logger.info(f"Generated research plan with {len(new_plan)} categories.")
-        _save_plan_to_md(new_plan, output_dir)  # Save the hierarchical plan
+        await asyncio.to_thread(_save_plan_to_md, new_plan, output_dir)  # Save the hierarchical plan
 
         return {
             "research_plan": new_plan,
@@ -719,7 +771,7 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
                     if stop_event and stop_event.is_set():
                         logger.info(f"Stop requested before executing tool: {tool_name}")
                         current_task["status"] = "pending"  # Or a new "stopped" status
-                        _save_plan_to_md(plan, output_dir)
+                        await asyncio.to_thread(_save_plan_to_md, plan, output_dir)
                         return {"stop_requested": True, "research_plan": plan, "current_category_index": cat_idx,
                                 "current_task_index_in_category": task_idx}
 
@@ -736,7 +788,9 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
                             {"tool_name": tool_name, "args": tool_args, "output": str(tool_output),
                              "status": "completed"})
 
-                    tool_results.append(ToolMessage(content=json.dumps(tool_output), tool_call_id=tool_call_id))
+                    # Compact separators and raw unicode keep the tool payload small in the LLM context
+                    tool_content = json.dumps(tool_output, ensure_ascii=False, separators=(",", ":"))
+                    tool_results.append(ToolMessage(content=tool_content, tool_call_id=tool_call_id))
 
                 except Exception as e:
                     logger.error(f"Error executing tool '{tool_name}': {e}", exc_info=True)
@@ -763,9 +817,11 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
                 current_task["status"] = "failed"  # Or a more specific status
                 current_task["result_summary"] = "LLM prepared for tool call but provided no tools."
 
-        # Save progress
-        _save_plan_to_md(plan, output_dir)
-        _save_search_results_to_json(current_search_results, output_dir)
+        # Save progress off the event loop, both files in parallel
+        await asyncio.gather(
+            asyncio.to_thread(_save_plan_to_md, plan, output_dir),
+            asyncio.to_thread(_save_search_results_to_json, current_search_results, output_dir),
+        )
 
         # Determine next indices
         next_task_idx = task_idx + 1
@@ -788,7 +844,7 @@ async def research_execution_node(state: DeepResearchState) -> Dict[str, Any]:
         logger.error(f"Unhandled error during research execution for task '{current_task['task_description']}': {e}",
                      exc_info=True)
         current_task["status"] = "failed"
-        _save_plan_to_md(plan, output_dir)
+        await asyncio.to_thread(_save_plan_to_md, plan, output_dir)
         # Determine next indices even on error to attempt to move on
         next_task_idx = task_idx + 1
         next_cat_idx = cat_idx
@@ -820,7 +876,7 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
     if not search_results:
         logger.warning("No search results found to synthesize report.")
         report = f"# Research Report: {topic}\n\nNo information was gathered during the research process."
-        _save_report_to_md(report, output_dir)
+        await asyncio.to_thread(_save_report_to_md, report, output_dir)
         return {"final_report": report}
 
     logger.info(
@@ -829,7 +885,8 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
 
     # Prepare context for the LLM
     # Format search results nicely, maybe group by query or original plan step
-    formatted_results = ""
+    # Collect the pieces in a list and join once instead of growing a string per line
+    result_parts = []
     references = {}
     ref_count = 1
     for i, result_entry in enumerate(search_results):
@@ -841,29 +898,37 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
 
         if tool_name == "parallel_browser_search" and status == "completed" and result_data:
             # result_data is the summary from BrowserUseAgent
-            formatted_results += f'### Finding from Web Search Query: "{query}"\n'
-            formatted_results += f"- **Summary:**\n{result_data}\n"  # result_data is already a summary string here
             # If result_data contained title/URL, you'd format them here.
             # The current BrowserUseAgent returns a string summary directly as 'final_data' in run_single_browser_task
-            formatted_results += "---\n"
+            result_parts.append(
+                f'### Finding from Web Search Query: "{query}"\n'
+                f"- **Summary:**\n{result_data}\n"  # result_data is already a summary string here
+                "---\n"
+            )
         elif tool_name != "parallel_browser_search" and status == "completed" and tool_output_str:
-            formatted_results += f'### Finding from Tool: "{tool_name}" (Args: {result_entry.get("args")})\n'
-            formatted_results += f"- **Output:**\n{tool_output_str}\n"
-            formatted_results += "---\n"
+            result_parts.append(
+                f'### Finding from Tool: "{tool_name}" (Args: {result_entry.get("args")})\n'
+                f"- **Output:**\n{tool_output_str}\n"
+                "---\n"
+            )
         elif status == "failed":
             error = result_entry.get("error")
             q_or_t = f"Query: \"{query}\"" if query != "Unknown Query" else f"Tool: \"{tool_name}\""
-            formatted_results += f'### Failed {q_or_t}\n'
-            formatted_results += f"- **Error:** {error}\n"
-            formatted_results += "---\n"
+            result_parts.append(
+                f'### Failed {q_or_t}\n'
+                f"- **Error:** {error}\n"
+                "---\n"
+            )
+    formatted_results = "".join(result_parts)
 
     # Prepare the research plan context
-    plan_summary = "\nResearch Plan Followed:\n"
+    plan_parts = ["\nResearch Plan Followed:\n"]
     for cat_idx, category in enumerate(plan):
-        plan_summary += f"\n#### Category {cat_idx + 1}: {category['category_name']}\n"
+        plan_parts.append(f"\n#### Category {cat_idx + 1}: {category['category_name']}\n")
         for task_idx, task in enumerate(category['tasks']):
             marker = "[x]" if task["status"] == "completed" else "[ ]" if task["status"] == "pending" else "[-]"
-            plan_summary += f"  - {marker} {task['task_description']}\n"
+            plan_parts.append(f"  - {marker} {task['task_description']}\n")
+    plan_summary = "".join(plan_parts)
 
     synthesis_prompt = ChatPromptTemplate.from_messages(
         [
@@ -920,7 +985,7 @@ async def synthesis_node(state: DeepResearchState) -> Dict[str, Any]:
             final_report_md += report_references_section
 
         logger.info("Successfully synthesized the final report.")
-        _save_report_to_md(final_report_md, output_dir)
+        await asyncio.to_thread(_save_report_to_md, final_report_md, output_dir)
         return {"final_report": final_report_md}
 
     except Exception as e:
@@ -8,6 +8,7 @@ from langchain_core.language_models.base import (
     LanguageModelInput,
 )
 import os
+from functools import lru_cache
 from langchain_core.load import dumpd, dumps
 from langchain_core.messages import (
     AIMessage,
@@ -325,3 +326,20 @@ def get_llm_model(provider: str, **kwargs):
         )
     else:
         raise ValueError(f"Unsupported provider: {provider}")
+
+
+@lru_cache(maxsize=8)
+def get_cached_llm_model(provider: str, model_name: str, temperature: float, base_url: Optional[str] = None,
+                         api_key: Optional[str] = None, num_ctx: Optional[int] = None):
+    """
+    get_llm_model memoized on its settings, so runs with unchanged settings reuse one client.
+    Call get_cached_llm_model.cache_clear() to drop the cached clients.
+    """
+    return get_llm_model(
+        provider=provider,
+        model_name=model_name,
+        temperature=temperature,
+        base_url=base_url,
+        api_key=api_key,
+        num_ctx=num_ctx,
+    )
@@ -1,7 +1,7 @@
 import base64
 import os
 import time
-from pathlib import Path
+from functools import partial
 from typing import Dict, Optional
 import requests
 import json
@@ -17,6 +17,13 @@ def encode_image(img_path):
     return image_data
 
 
+def named_partial(name: str, func, /, *args, **kwargs) -> partial:
+    """Bind arguments with partial and give the result a __name__, which Gradio uses as the api_name"""
+    bound = partial(func, *args, **kwargs)
+    bound.__name__ = name
+    return bound
+
+
 def get_latest_files(directory: str, file_types: list = ['.webm', '.zip']) -> Dict[str, Optional[str]]:
     """Get the latest recording and trace files"""
     latest_files: Dict[str, Optional[str]] = {ext: None for ext in file_types}
@@ -25,15 +32,29 @@ def get_latest_files(directory: str, file_types: list = ['.webm', '.zip']) -> Di
         os.makedirs(directory, exist_ok=True)
         return latest_files
 
-    for file_type in file_types:
-        try:
-            matches = list(Path(directory).rglob(f"*{file_type}"))
-            if matches:
-                latest = max(matches, key=lambda p: p.stat().st_mtime)
-                # Only return files that are complete (not being written)
-                if time.time() - latest.stat().st_mtime > 1.0:
-                    latest_files[file_type] = str(latest)
-        except Exception as e:
-            print(f"Error getting latest {file_type} file: {e}")
+    # Single walk over the tree with one stat per matching file
+    latest: Dict[str, tuple] = {}
+    try:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                file_type = next((ext for ext in file_types if name.endswith(ext)), None)
+                if file_type is None:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    # The file vanished or is unreadable mid-scan; skip it rather than end the walk
+                    continue
+                if file_type not in latest or mtime > latest[file_type][1]:
+                    latest[file_type] = (path, mtime)
+    except Exception as e:
+        print(f"Error getting latest files in {directory}: {e}")
+
+    now = time.time()
+    for file_type, (path, mtime) in latest.items():
+        # Only return files that are complete (not being written)
+        if now - mtime > 1.0:
+            latest_files[file_type] = path
 
     return latest_files
@@ -6,8 +6,8 @@ from gradio.components import Component
 from typing import Any, Dict, Optional
 from src.webui.webui_manager import WebuiManager
 from src.utils import config
+from src.utils.utils import named_partial
 import logging
-from functools import partial
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ async def update_mcp_server(mcp_file: str, webui_manager: WebuiManager):
     """
     Update the MCP server.
     """
-    if hasattr(webui_manager, "bu_controller") and webui_manager.bu_controller:
+    if webui_manager.bu_controller:
         logger.warning("⚠️ Close controller because mcp file has changed!")
         await webui_manager.bu_controller.close_mcp_client()
         webui_manager.bu_controller = None
@@ -47,7 +47,6 @@ def create_agent_settings_tab(webui_manager: WebuiManager):
     """
     Creates an agent settings tab.
     """
-    input_components = set(webui_manager.get_components())
     tab_components = {}
 
     with gr.Group():
@@ -257,13 +256,8 @@ def create_agent_settings_tab(webui_manager: WebuiManager):
         outputs=[planner_llm_model_name]
     )
 
-    async def update_wrapper(mcp_file):
-        """Wrapper for handle_pause_resume."""
-        update_dict = await update_mcp_server(mcp_file, webui_manager)
-        yield update_dict
-
     mcp_json_file.change(
-        update_wrapper,
+        named_partial("update_wrapper", update_mcp_server, webui_manager=webui_manager),
         inputs=[mcp_json_file],
         outputs=[mcp_server_config, mcp_server_config]
     )
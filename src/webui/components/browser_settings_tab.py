@@ -31,7 +31,6 @@ def create_browser_settings_tab(webui_manager: WebuiManager):
     """
     Creates a browser settings tab.
     """
-    input_components = set(webui_manager.get_components())
     tab_components = {}
 
     with gr.Group():
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import uuid
+from types import SimpleNamespace
 from typing import Any, AsyncGenerator, Dict, Optional
 
 import gradio as gr
@@ -15,22 +16,21 @@ from browser_use.agent.views import (
 from browser_use.browser.browser import BrowserConfig
 from browser_use.browser.context import BrowserContext, BrowserContextConfig
 from browser_use.browser.views import BrowserState
-from gradio.components import Component
 from langchain_core.language_models.chat_models import BaseChatModel
 
 from src.agent.browser_use.browser_use_agent import BrowserUseAgent
 from src.browser.custom_browser import CustomBrowser
 from src.controller.custom_controller import CustomController
 from src.utils import llm_provider
+from src.utils.utils import named_partial
 from src.webui.webui_manager import WebuiManager
 
 logger = logging.getLogger(__name__)
 
-
 # --- Helper Functions --- (Defined at module level)
 
 
-async def _initialize_llm(
+def _initialize_llm(
         provider: Optional[str],
         model_name: Optional[str],
         temperature: float,
@@ -47,8 +47,8 @@ async def _initialize_llm(
         logger.info(
             f"Initializing LLM: Provider={provider}, Model={model_name}, Temp={temperature}"
         )
-        # Example using a placeholder function
-        llm = llm_provider.get_llm_model(
+        # Cached per settings, so an unchanged configuration reuses its client
+        llm = llm_provider.get_cached_llm_model(
             provider=provider,
             model_name=model_name,
             temperature=temperature,
@@ -135,15 +135,7 @@ async def _handle_new_step(
         webui_manager: WebuiManager, state: BrowserState, output: AgentOutput, step_num: int
 ):
     """Callback for each step taken by the agent, including screenshot display."""
-
-    # Use the correct chat history attribute name from the user's code
-    if not hasattr(webui_manager, "bu_chat_history"):
-        logger.error(
-            "Attribute 'bu_chat_history' not found in webui_manager! Cannot add chat message."
-        )
-        # Initialize it maybe? Or raise an error? For now, log and potentially skip chat update.
-        webui_manager.bu_chat_history = []  # Initialize if missing (consider if this is the right place)
-        # return # Or stop if this is critical
+    # bu_chat_history is always set up by WebuiManager.init_browser_use_agent
     step_num -= 1
     logger.info(f"Step {step_num} completed.")
 
@@ -199,12 +191,15 @@ async def _handle_new_step(
 
 def _handle_done(webui_manager: WebuiManager, history: AgentHistoryList):
     """Callback when the agent finishes the task (success or failure)."""
+    # Each accessor walks the whole history, so resolve them once
+    duration = history.total_duration_seconds()
+    input_tokens = history.total_input_tokens()
     logger.info(
-        f"Agent task finished. Duration: {history.total_duration_seconds():.2f}s, Tokens: {history.total_input_tokens()}"
+        f"Agent task finished. Duration: {duration:.2f}s, Tokens: {input_tokens}"
     )
     final_summary = "**Task Completed**\n"
-    final_summary += f"- Duration: {history.total_duration_seconds():.2f} seconds\n"
-    final_summary += f"- Total Input Tokens: {history.total_input_tokens()}\n"  # Or total tokens if available
+    final_summary += f"- Duration: {duration:.2f} seconds\n"
+    final_summary += f"- Total Input Tokens: {input_tokens}\n"  # Or total tokens if available
 
     final_result = history.final_result()
     if final_result:
@@ -227,10 +222,6 @@ async def _ask_assistant_callback(
     """Callback triggered by the agent's ask_for_assistant action."""
     logger.info("Agent requires assistance. Waiting for user input.")
 
-    if not hasattr(webui_manager, "_chat_history"):
-        logger.error("Chat history not found in webui_manager during ask_assistant!")
-        return {"response": "Internal Error: Cannot display help request."}
-
     webui_manager.bu_chat_history.append(
         {
             "role": "assistant",
@@ -279,25 +270,15 @@ async def run_agent_task(
 
     # --- Get Components ---
     # Need handles to specific UI components to update them
-    user_input_comp = webui_manager.get_component_by_id("browser_use_agent.user_input")
-    run_button_comp = webui_manager.get_component_by_id("browser_use_agent.run_button")
-    stop_button_comp = webui_manager.get_component_by_id(
-        "browser_use_agent.stop_button"
-    )
-    pause_resume_button_comp = webui_manager.get_component_by_id(
-        "browser_use_agent.pause_resume_button"
-    )
-    clear_button_comp = webui_manager.get_component_by_id(
-        "browser_use_agent.clear_button"
-    )
-    chatbot_comp = webui_manager.get_component_by_id("browser_use_agent.chatbot")
-    history_file_comp = webui_manager.get_component_by_id(
-        "browser_use_agent.agent_history_file"
-    )
-    gif_comp = webui_manager.get_component_by_id("browser_use_agent.recording_gif")
-    browser_view_comp = webui_manager.get_component_by_id(
-        "browser_use_agent.browser_view"
-    )
+    user_input_comp = webui_manager.bu_components.user_input
+    run_button_comp = webui_manager.bu_components.run_button
+    stop_button_comp = webui_manager.bu_components.stop_button
+    pause_resume_button_comp = webui_manager.bu_components.pause_resume_button
+    clear_button_comp = webui_manager.bu_components.clear_button
+    chatbot_comp = webui_manager.bu_components.chatbot
+    history_file_comp = webui_manager.bu_components.agent_history_file
+    gif_comp = webui_manager.bu_components.recording_gif
+    browser_view_comp = webui_manager.bu_components.browser_view
 
     # --- 1. Get Task and Initial UI Update ---
     task = components.get(user_input_comp, "").strip()
@@ -366,7 +347,7 @@ async def run_agent_task(
         planner_llm_api_key = get_setting("planner_llm_api_key") or None
         planner_use_vision = get_setting("planner_use_vision", False)
 
-        planner_llm = await _initialize_llm(
+        planner_llm = _initialize_llm(
             planner_llm_provider_name,
             planner_llm_model_name,
             planner_llm_temperature,
@@ -411,7 +392,7 @@ async def run_agent_task(
         os.makedirs(save_download_path, exist_ok=True)
 
     # --- 2. Initialize LLM ---
-    main_llm = await _initialize_llm(
+    main_llm = _initialize_llm(
         llm_provider_name,
         llm_model_name,
         llm_temperature,
@@ -491,21 +472,12 @@ async def run_agent_task(
             )
 
         # --- 5. Initialize or Update Agent ---
-        webui_manager.bu_agent_task_id = str(uuid.uuid4())  # New ID for this task run
-        os.makedirs(
-            os.path.join(save_agent_history_path, webui_manager.bu_agent_task_id),
-            exist_ok=True,
-        )
-        history_file = os.path.join(
-            save_agent_history_path,
-            webui_manager.bu_agent_task_id,
-            f"{webui_manager.bu_agent_task_id}.json",
-        )
-        gif_path = os.path.join(
-            save_agent_history_path,
-            webui_manager.bu_agent_task_id,
-            f"{webui_manager.bu_agent_task_id}.gif",
-        )
+        task_id = str(uuid.uuid4())  # New ID for this task run
+        webui_manager.bu_agent_task_id = task_id
+        task_dir = os.path.join(save_agent_history_path, task_id)
+        os.makedirs(task_dir, exist_ok=True)
+        history_file = os.path.join(task_dir, f"{task_id}.json")
+        gif_path = os.path.join(task_dir, f"{task_id}.gif")
 
         # Pass the webui_manager to callbacks when wrapping them
         async def step_callback_wrapper(
@@ -556,6 +528,9 @@ async def run_agent_task(
         webui_manager.bu_current_task = agent_task  # Store the task
 
         last_chat_len = len(webui_manager.bu_chat_history)
+        # Only push the browser view when it actually changes
+        last_screenshot = None
+        browser_view_hidden = False
         while not agent_task.done():
             is_paused = webui_manager.bu_agent.state.paused
             is_stopped = webui_manager.bu_agent.state.stopped
@@ -661,24 +636,25 @@ async def run_agent_task(
                     screenshot_b64 = (
                         await webui_manager.bu_browser_context.take_screenshot()
                     )
-                    if screenshot_b64:
-                        html_content = f'<img src="data:image/jpeg;base64,{screenshot_b64}" style="width:{stream_vw}vw; height:{stream_vh}vh ; border:1px solid #ccc;">'
-                        update_dict[browser_view_comp] = gr.update(
-                            value=html_content, visible=True
-                        )
-                    else:
-                        html_content = f"<h1 style='width:{stream_vw}vw; height:{stream_vh}vh'>Waiting for browser session...</h1>"
+                    if (screenshot_b64 or "") != last_screenshot:
+                        if screenshot_b64:
+                            html_content = f'<img src="data:image/jpeg;base64,{screenshot_b64}" style="width:{stream_vw}vw; height:{stream_vh}vh ; border:1px solid #ccc;">'
+                        else:
+                            html_content = f"<h1 style='width:{stream_vw}vw; height:{stream_vh}vh'>Waiting for browser session...</h1>"
                         update_dict[browser_view_comp] = gr.update(
                             value=html_content, visible=True
                         )
+                        last_screenshot = screenshot_b64 or ""
                 except Exception as e:
                     logger.debug(f"Failed to capture screenshot: {e}")
                     update_dict[browser_view_comp] = gr.update(
                         value="<div style='...'>Error loading view...</div>",
                         visible=True,
                     )
-            else:
+                    last_screenshot = None
+            elif not browser_view_hidden:
                 update_dict[browser_view_comp] = gr.update(visible=False)
+                browser_view_hidden = True
 
             # Yield accumulated updates
             if update_dict:
@@ -705,7 +681,7 @@ async def run_agent_task(
             if os.path.exists(history_file):
                 final_update[history_file_comp] = gr.File(value=history_file)
 
-            if gif_path and os.path.exists(gif_path):
+            if os.path.exists(gif_path):
                 logger.info(f"GIF found at: {gif_path}")
                 final_update[gif_comp] = gr.Image(value=gif_path)
 
@@ -796,7 +772,7 @@ async def handle_submit(
         webui_manager: WebuiManager, components: Dict[gr.components.Component, Any]
 ):
     """Handles clicks on the main 'Submit' button."""
-    user_input_comp = webui_manager.get_component_by_id("browser_use_agent.user_input")
+    user_input_comp = webui_manager.bu_components.user_input
     user_input_value = components.get(user_input_comp, "").strip()
 
     # Check if waiting for user assistance
@@ -813,9 +789,7 @@ async def handle_submit(
                 interactive=False,
                 placeholder="Waiting for agent to continue...",
             ),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.run_button"
-            ): gr.update(value="⏳ Running...", interactive=False),
+            webui_manager.bu_components.run_button: gr.update(value="⏳ Running...", interactive=False),
         }
     # Check if a task is currently running (using _current_task)
     elif webui_manager.bu_current_task and not webui_manager.bu_current_task.done():
@@ -843,32 +817,18 @@ async def handle_stop(webui_manager: WebuiManager):
         agent.state.stopped = True
         agent.state.paused = False  # Ensure not paused if stopped
         return {
-            webui_manager.get_component_by_id(
-                "browser_use_agent.stop_button"
-            ): gr.update(interactive=False, value="⏹️ Stopping..."),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.pause_resume_button"
-            ): gr.update(interactive=False),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.run_button"
-            ): gr.update(interactive=False),
+            webui_manager.bu_components.stop_button: gr.update(interactive=False, value="⏹️ Stopping..."),
+            webui_manager.bu_components.pause_resume_button: gr.update(interactive=False),
+            webui_manager.bu_components.run_button: gr.update(interactive=False),
         }
     else:
         logger.warning("Stop clicked but agent is not running or task is already done.")
         # Reset UI just in case it's stuck
         return {
-            webui_manager.get_component_by_id(
-                "browser_use_agent.run_button"
-            ): gr.update(interactive=True),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.stop_button"
-            ): gr.update(interactive=False),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.pause_resume_button"
-            ): gr.update(interactive=False),
-            webui_manager.get_component_by_id(
-                "browser_use_agent.clear_button"
-            ): gr.update(interactive=True),
+            webui_manager.bu_components.run_button: gr.update(interactive=True),
+            webui_manager.bu_components.stop_button: gr.update(interactive=False),
+            webui_manager.bu_components.pause_resume_button: gr.update(interactive=False),
+            webui_manager.bu_components.clear_button: gr.update(interactive=True),
         }
 
 
@@ -883,17 +843,13 @@ async def handle_pause_resume(webui_manager: WebuiManager):
             agent.resume()
             # UI update happens in main loop
             return {
-                webui_manager.get_component_by_id(
-                    "browser_use_agent.pause_resume_button"
-                ): gr.update(value="⏸️ Pause", interactive=True)
+                webui_manager.bu_components.pause_resume_button: gr.update(value="⏸️ Pause", interactive=True)
             }  # Optimistic update
         else:
             logger.info("Pause button clicked.")
             agent.pause()
             return {
-                webui_manager.get_component_by_id(
-                    "browser_use_agent.pause_resume_button"
-                ): gr.update(value="▶️ Resume", interactive=True)
+                webui_manager.bu_components.pause_resume_button: gr.update(value="▶️ Resume", interactive=True)
             }  # Optimistic update
     else:
         logger.warning(
@@ -924,6 +880,7 @@ async def handle_clear(webui_manager: WebuiManager):
         await webui_manager.bu_controller.close_mcp_client()
         webui_manager.bu_controller = None
     webui_manager.bu_agent = None
+    llm_provider.get_cached_llm_model.cache_clear()
 
     # Reset state stored in manager
     webui_manager.bu_chat_history = []
@@ -935,31 +892,27 @@ async def handle_clear(webui_manager: WebuiManager):
 
     # Reset UI components
     return {
-        webui_manager.get_component_by_id("browser_use_agent.chatbot"): gr.update(
+        webui_manager.bu_components.chatbot: gr.update(
             value=[]
         ),
-        webui_manager.get_component_by_id("browser_use_agent.user_input"): gr.update(
+        webui_manager.bu_components.user_input: gr.update(
             value="", placeholder="Enter your task here..."
         ),
-        webui_manager.get_component_by_id(
-            "browser_use_agent.agent_history_file"
-        ): gr.update(value=None),
-        webui_manager.get_component_by_id("browser_use_agent.recording_gif"): gr.update(
+        webui_manager.bu_components.agent_history_file: gr.update(value=None),
+        webui_manager.bu_components.recording_gif: gr.update(
             value=None
         ),
-        webui_manager.get_component_by_id("browser_use_agent.browser_view"): gr.update(
+        webui_manager.bu_components.browser_view: gr.update(
             value="<div style='...'>Browser Cleared</div>"
         ),
-        webui_manager.get_component_by_id("browser_use_agent.run_button"): gr.update(
+        webui_manager.bu_components.run_button: gr.update(
             value="▶️ Submit Task", interactive=True
         ),
-        webui_manager.get_component_by_id("browser_use_agent.stop_button"): gr.update(
+        webui_manager.bu_components.stop_button: gr.update(
             interactive=False
         ),
-        webui_manager.get_component_by_id(
-            "browser_use_agent.pause_resume_button"
-        ): gr.update(value="⏸️ Pause", interactive=False),
-        webui_manager.get_component_by_id("browser_use_agent.clear_button"): gr.update(
+        webui_manager.bu_components.pause_resume_button: gr.update(value="⏸️ Pause", interactive=False),
+        webui_manager.bu_components.clear_button: gr.update(
             interactive=True
         ),
     }
@@ -1037,43 +990,34 @@ def create_browser_use_agent_tab(webui_manager: WebuiManager):
     webui_manager.add_components(
         "browser_use_agent", tab_components
     )  # Use "browser_use_agent" as tab_name prefix
+    # Resolve the handles once so the handlers don't look them up by ID on every click
+    webui_manager.bu_components = SimpleNamespace(**tab_components)
 
-    all_managed_components = set(
-        webui_manager.get_components()
+    all_managed_components = (
+        webui_manager.get_components_frozen()
     )  # Get all components known to manager
     run_tab_outputs = list(tab_components.values())
 
-    async def submit_wrapper(
-            components_dict: Dict[Component, Any],
-    ) -> AsyncGenerator[Dict[Component, Any], None]:
-        """Wrapper for handle_submit that yields its results."""
-        async for update in handle_submit(webui_manager, components_dict):
-            yield update
-
-    async def stop_wrapper() -> AsyncGenerator[Dict[Component, Any], None]:
-        """Wrapper for handle_stop."""
-        update_dict = await handle_stop(webui_manager)
-        yield update_dict
-
-    async def pause_resume_wrapper() -> AsyncGenerator[Dict[Component, Any], None]:
-        """Wrapper for handle_pause_resume."""
-        update_dict = await handle_pause_resume(webui_manager)
-        yield update_dict
-
-    async def clear_wrapper() -> AsyncGenerator[Dict[Component, Any], None]:
-        """Wrapper for handle_clear."""
-        update_dict = await handle_clear(webui_manager)
-        yield update_dict
-
-    # --- Connect Event Handlers using the Wrappers --
+    # --- Connect Event Handlers, binding the manager with a named partial ---
+    submit_fn = named_partial("submit_wrapper", handle_submit, webui_manager)
     run_button.click(
-        fn=submit_wrapper, inputs=all_managed_components, outputs=run_tab_outputs
+        fn=submit_fn, inputs=all_managed_components, outputs=run_tab_outputs
     )
     user_input.submit(
-        fn=submit_wrapper, inputs=all_managed_components, outputs=run_tab_outputs
+        fn=submit_fn, inputs=all_managed_components, outputs=run_tab_outputs
+    )
+    stop_button.click(
+        fn=named_partial("stop_wrapper", handle_stop, webui_manager),
+        inputs=None,
+        outputs=run_tab_outputs,
     )
-    stop_button.click(fn=stop_wrapper, inputs=None, outputs=run_tab_outputs)
     pause_resume_button.click(
-        fn=pause_resume_wrapper, inputs=None, outputs=run_tab_outputs
+        fn=named_partial("pause_resume_wrapper", handle_pause_resume, webui_manager),
+        inputs=None,
+        outputs=run_tab_outputs,
+    )
+    clear_button.click(
+        fn=named_partial("clear_wrapper", handle_clear, webui_manager),
+        inputs=None,
+        outputs=run_tab_outputs,
     )
-    clear_button.click(fn=clear_wrapper, inputs=None, outputs=run_tab_outputs)
@@ -1,6 +1,5 @@
 import gradio as gr
 from gradio.components import Component
-from functools import partial
 
 from src.webui.webui_manager import WebuiManager
 from src.utils import config
@@ -9,13 +8,12 @@ import os
 from typing import Any, Dict, AsyncGenerator, Optional, Tuple, Union
 import asyncio
 import json
-from src.agent.deep_research.deep_research_agent import DeepResearchAgent
 from src.utils import llm_provider
+from src.utils.utils import named_partial
 
 logger = logging.getLogger(__name__)
 
-
-async def _initialize_llm(provider: Optional[str], model_name: Optional[str], temperature: float,
+def _initialize_llm(provider: Optional[str], model_name: Optional[str], temperature: float,
                           base_url: Optional[str], api_key: Optional[str], num_ctx: Optional[int] = None):
     """Initializes the LLM based on settings. Returns None if provider/model is missing."""
     if not provider or not model_name:
@@ -24,7 +22,7 @@ async def _initialize_llm(provider: Optional[str], model_name: Optional[str], te
     try:
         logger.info(f"Initializing LLM: Provider={provider}, Model={model_name}, Temp={temperature}")
         # Use your actual LLM provider logic here
-        llm = llm_provider.get_llm_model(
+        llm = llm_provider.get_cached_llm_model(
             provider=provider,
             model_name=model_name,
             temperature=temperature,
@@ -42,11 +40,11 @@ async def _initialize_llm(provider: Optional[str], model_name: Optional[str], te
 
 def _read_file_safe(file_path: str) -> Optional[str]:
     """Safely read a file, returning None if it doesn't exist or on error."""
-    if not os.path.exists(file_path):
-        return None
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
+    except FileNotFoundError:
+        return None
     except Exception as e:
         logger.error(f"Error reading file {file_path}: {e}")
         return None
@@ -83,21 +81,15 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         yield {start_button_comp: gr.update(interactive=True)}  # Re-enable start button
         return
 
-    # Store base save dir for stop handler
-    webui_manager.dr_save_dir = base_save_dir
-    os.makedirs(base_save_dir, exist_ok=True)
-
-    # --- 2. Initial UI Update ---
-    yield {
-        start_button_comp: gr.update(value="⏳ Running...", interactive=False),
-        stop_button_comp: gr.update(interactive=True),
-        research_task_comp: gr.update(interactive=False),
-        resume_task_id_comp: gr.update(interactive=False),
-        parallel_num_comp: gr.update(interactive=False),
-        save_dir_comp: gr.update(interactive=False),
-        markdown_display_comp: gr.update(value="Starting research..."),
-        markdown_download_comp: gr.update(value=None, interactive=False)
-    }
+    # Claim the run before the first yield, so a double click can't start a second agent.
+    # Bind the lock once so the finally releases the same object even if the manager's lock is replaced.
+    run_lock = webui_manager.dr_lock
+    if run_lock.locked():
+        logger.warning("Run clicked while deep research is already running.")
+        gr.Info("Research is already running. Please wait or use Stop.")
+        yield {}  # No change
+        return
+    await run_lock.acquire()
 
     agent_task = None
     running_task_id = None
@@ -107,6 +99,22 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
     last_plan_mtime = 0
 
     try:
+        # Store base save dir for stop handler
+        webui_manager.dr_save_dir = base_save_dir
+        os.makedirs(base_save_dir, exist_ok=True)
+
+        # --- 2. Initial UI Update ---
+        yield {
+            start_button_comp: gr.update(value="⏳ Running...", interactive=False),
+            stop_button_comp: gr.update(interactive=True),
+            research_task_comp: gr.update(interactive=False),
+            resume_task_id_comp: gr.update(interactive=False),
+            parallel_num_comp: gr.update(interactive=False),
+            save_dir_comp: gr.update(interactive=False),
+            markdown_display_comp: gr.update(value="Starting research..."),
+            markdown_download_comp: gr.update(value=None, interactive=False)
+        }
+
         # --- 3. Get LLM and Browser Config from other tabs ---
         # Access settings values via components dict, getting IDs from webui_manager
         def get_setting(tab: str, key: str, default: Any = None):
@@ -121,7 +129,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         llm_api_key = get_setting("agent_settings", "llm_api_key")
         ollama_num_ctx = get_setting("agent_settings", "ollama_num_ctx")
 
-        llm = await _initialize_llm(
+        llm = _initialize_llm(
             llm_provider_name, llm_model_name, llm_temperature, llm_base_url, llm_api_key,
             ollama_num_ctx if llm_provider_name == "ollama" else None
         )
@@ -142,6 +150,9 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
 
         # --- 4. Initialize or Get Agent ---
         if not webui_manager.dr_agent:
+            # Deferred so the UI can start without importing langgraph until research is run
+            from src.agent.deep_research.deep_research_agent import DeepResearchAgent
+
             webui_manager.dr_agent = DeepResearchAgent(
                 llm=llm,
                 browser_config=browser_config_dict,
@@ -188,9 +199,13 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             logger.warning("Cannot monitor plan file: Task ID unknown.")
             plan_file_path = None
         last_plan_content = None
+        # Send the task ID with the first monitoring frame only, not on every tick
+        task_id_shown = False
         while not agent_task.done():
             update_dict = {}
-            update_dict[resume_task_id_comp] = gr.update(value=running_task_id)
+            if not task_id_shown:
+                update_dict[resume_task_id_comp] = gr.update(value=running_task_id)
+                task_id_shown = True
             agent_stopped = getattr(webui_manager.dr_agent, 'stopped', False)
             if agent_stopped:
                 logger.info("Stop signal detected from agent state.")
@@ -199,7 +214,11 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
             # Check and update research plan display
             if plan_file_path:
                 try:
-                    current_mtime = os.path.getmtime(plan_file_path) if os.path.exists(plan_file_path) else 0
+                    # One stat per tick; a missing file just reads as "not modified yet"
+                    try:
+                        current_mtime = os.path.getmtime(plan_file_path)
+                    except OSError:
+                        current_mtime = 0
                     if current_mtime > last_plan_mtime:
                         logger.info(f"Detected change in {plan_file_path}")
                         plan_content = _read_file_safe(plan_file_path)
@@ -260,6 +279,13 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
 
         yield final_ui_update
 
+    except asyncio.CancelledError:
+        # The UI handler was cancelled; don't leave the agent run behind holding browsers open
+        if agent_task and not agent_task.done():
+            logger.info("Deep research handler cancelled, cancelling agent run task.")
+            agent_task.cancel()
+            await asyncio.gather(agent_task, return_exceptions=True)
+        raise
 
     except Exception as e:
         logger.error(f"Error during Deep Research Agent execution: {e}", exc_info=True)
@@ -270,6 +296,7 @@ async def run_deep_research(webui_manager: WebuiManager, components: Dict[Compon
         # --- 8. Final UI Reset ---
         webui_manager.dr_current_task = None  # Clear task reference
         webui_manager.dr_task_id = None  # Clear running task ID
+        run_lock.release()
 
         yield {
             start_button_comp: gr.update(value="▶️ Run", interactive=True),
@@ -313,7 +340,8 @@ async def stop_deep_research(webui_manager: WebuiManager) -> Dict[Component, Any
         # We yield an intermediate "Stopping..." state. The final reset is done by run_deep_research.
 
         # Try to show the final report if available after stopping
-        await asyncio.sleep(1.5)  # Give agent a moment to write final files potentially
+        # Give agent a moment to write final files, returning early once the run task has wound down
+        await asyncio.wait({task}, timeout=1.5)
         report_file_path = None
         if task_id and base_save_dir:
             report_file_path = os.path.join(base_save_dir, str(task_id), "report.md")
@@ -342,7 +370,7 @@ async def stop_deep_research(webui_manager: WebuiManager) -> Dict[Component, Any
             stop_button_comp: gr.update(interactive=False),
             webui_manager.get_component_by_id("deep_research_agent.research_task"): gr.update(interactive=True),
             webui_manager.get_component_by_id("deep_research_agent.resume_task_id"): gr.update(interactive=True),
-            webui_manager.get_component_by_id("deep_research_agent.max_iteration"): gr.update(interactive=True),
+            webui_manager.get_component_by_id("deep_research_agent.parallel_num"): gr.update(interactive=True),
             webui_manager.get_component_by_id("deep_research_agent.max_query"): gr.update(interactive=True),
         }
 
@@ -353,7 +381,7 @@ async def update_mcp_server(mcp_file: str, webui_manager: WebuiManager):
     """
     Update the MCP server.
     """
-    if hasattr(webui_manager, "dr_agent") and webui_manager.dr_agent:
+    if webui_manager.dr_agent:
         logger.warning("⚠️ Close controller because mcp file has changed!")
         await webui_manager.dr_agent.close_mcp_client()
 
@@ -371,7 +399,6 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
     """
     Creates a deep research agent tab
     """
-    input_components = set(webui_manager.get_components())
     tab_components = {}
 
     with gr.Group():
@@ -414,38 +441,29 @@ def create_deep_research_agent_tab(webui_manager: WebuiManager):
     webui_manager.add_components("deep_research_agent", tab_components)
     webui_manager.init_deep_research_agent()
 
-    async def update_wrapper(mcp_file):
-        """Wrapper for handle_pause_resume."""
-        update_dict = await update_mcp_server(mcp_file, webui_manager)
-        yield update_dict
-
     mcp_json_file.change(
-        update_wrapper,
+        named_partial("update_wrapper", update_mcp_server, webui_manager=webui_manager),
         inputs=[mcp_json_file],
         outputs=[mcp_server_config, mcp_server_config]
     )
 
     dr_tab_outputs = list(tab_components.values())
-    all_managed_inputs = set(webui_manager.get_components())
-
-    # --- Define Event Handler Wrappers ---
-    async def start_wrapper(comps: Dict[Component, Any]) -> AsyncGenerator[Dict[Component, Any], None]:
-        async for update in run_deep_research(webui_manager, comps):
-            yield update
-
-    async def stop_wrapper() -> AsyncGenerator[Dict[Component, Any], None]:
-        update_dict = await stop_deep_research(webui_manager)
-        yield update_dict
+    # Only send what run_deep_research reads, not e.g. the browser agent's chat history
+    dr_input_tabs = ("agent_settings", "browser_settings", "deep_research_agent")
+    dr_inputs = {
+        comp for comp_id, comp in webui_manager.id_to_component.items()
+        if comp_id.split(".", 1)[0] in dr_input_tabs
+    }
 
     # --- Connect Handlers ---
     start_button.click(
-        fn=start_wrapper,
-        inputs=all_managed_inputs,
+        fn=named_partial("start_wrapper", run_deep_research, webui_manager),
+        inputs=dr_inputs,
         outputs=dr_tab_outputs
     )
 
     stop_button.click(
-        fn=stop_wrapper,
+        fn=named_partial("stop_wrapper", stop_deep_research, webui_manager),
         inputs=None,
         outputs=dr_tab_outputs
     )
@@ -9,7 +9,6 @@ def create_load_save_config_tab(webui_manager: WebuiManager):
     """
     Creates a load and save config tab.
     """
-    input_components = set(webui_manager.get_components())
     tab_components = {}
 
     config_file = gr.File(
@@ -38,7 +37,7 @@ def create_load_save_config_tab(webui_manager: WebuiManager):
 
     save_config_button.click(
         fn=webui_manager.save_config,
-        inputs=set(webui_manager.get_components()),
+        inputs=webui_manager.get_components_frozen(),
         outputs=[config_status]
     )
 
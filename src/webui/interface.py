@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Optional
+
 import gradio as gr
 
 from src.webui.webui_manager import WebuiManager
@@ -7,41 +10,30 @@ from src.webui.components.browser_use_agent_tab import create_browser_use_agent_
 from src.webui.components.deep_research_agent_tab import create_deep_research_agent_tab
 from src.webui.components.load_save_config_tab import create_load_save_config_tab
 
+# Theme classes, instantiated only for the theme actually selected
 theme_map = {
-    "Default": gr.themes.Default(),
-    "Soft": gr.themes.Soft(),
-    "Monochrome": gr.themes.Monochrome(),
-    "Glass": gr.themes.Glass(),
-    "Origin": gr.themes.Origin(),
-    "Citrus": gr.themes.Citrus(),
-    "Ocean": gr.themes.Ocean(),
-    "Base": gr.themes.Base()
+    "Default": gr.themes.Default,
+    "Soft": gr.themes.Soft,
+    "Monochrome": gr.themes.Monochrome,
+    "Glass": gr.themes.Glass,
+    "Origin": gr.themes.Origin,
+    "Citrus": gr.themes.Citrus,
+    "Ocean": gr.themes.Ocean,
+    "Base": gr.themes.Base
 }
 
+# UI stylesheet, kept as a static file and handed to Gradio via css_paths
+CSS_PATH = Path(__file__).parent / "static" / "app.css"
+
+# Static header markup, rendered as plain HTML rather than parsed as Markdown
+HEADER_HTML = """
+<h1>🌐 Browser Use WebUI</h1>
+<h3>Control your browser with AI assistance</h3>
+"""
+MARKETPLACE_HEADER_HTML = "<h3>Agents built on Browser-Use</h3>"
 
-def create_ui(theme_name="Ocean"):
-    css = """
-    .gradio-container {
-        width: 70vw !important; 
-        max-width: 70% !important; 
-        margin-left: auto !important;
-        margin-right: auto !important;
-        padding-top: 10px !important;
-    }
-    .header-text {
-        text-align: center;
-        margin-bottom: 20px;
-    }
-    .tab-header-text {
-        text-align: center;
-    }
-    .theme-section {
-        margin-bottom: 10px;
-        padding: 15px;
-        border-radius: 10px;
-    }
-    """
 
+def create_ui(theme_name="Ocean", ui_manager: Optional[WebuiManager] = None):
     # dark mode in default
     js_func = """
     function refresh() {
@@ -54,19 +46,14 @@ def create_ui(theme_name="Ocean"):
     }
     """
 
-    ui_manager = WebuiManager()
+    # Callers may pass a long-lived manager; its init_* methods leave existing agent state untouched
+    ui_manager = ui_manager or WebuiManager()
 
     with gr.Blocks(
-            title="Browser Use WebUI", theme=theme_map[theme_name], css=css, js=js_func,
+            title="Browser Use WebUI", theme=theme_map[theme_name](), css_paths=CSS_PATH, js=js_func,
     ) as demo:
         with gr.Row():
-            gr.Markdown(
-                """
-                # 🌐 Browser Use WebUI
-                ### Control your browser with AI assistance
-                """,
-                elem_classes=["header-text"],
-            )
+            gr.HTML(HEADER_HTML, elem_classes=["header-text"])
 
         with gr.Tabs() as tabs:
             with gr.TabItem("⚙️ Agent Settings"):
@@ -79,12 +66,7 @@ def create_ui(theme_name="Ocean"):
                 create_browser_use_agent_tab(ui_manager)
 
             with gr.TabItem("🎁 Agent Marketplace"):
-                gr.Markdown(
-                    """
-                    ### Agents built on Browser-Use
-                    """,
-                    elem_classes=["tab-header-text"],
-                )
+                gr.HTML(MARKETPLACE_HEADER_HTML, elem_classes=["tab-header-text"])
                 with gr.Tabs():
                     with gr.TabItem("Deep Research"):
                         create_deep_research_agent_tab(ui_manager)
@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Optional, Dict, List
 import uuid
 import asyncio
+from types import SimpleNamespace
 
 from gradio.components import Component
 from browser_use.browser.browser import Browser
@@ -15,21 +16,30 @@ from browser_use.agent.service import Agent
 from src.browser.custom_browser import CustomBrowser
 from src.browser.custom_context import CustomBrowserContext
 from src.controller.custom_controller import CustomController
-from src.agent.deep_research.deep_research_agent import DeepResearchAgent
+
+if TYPE_CHECKING:
+    # Pulls in langgraph and the langchain file tools; only needed once a research run starts
+    from src.agent.deep_research.deep_research_agent import DeepResearchAgent
 
 
 class WebuiManager:
     def __init__(self, settings_save_dir: str = "./tmp/webui_settings"):
         self.id_to_component: dict[str, Component] = {}
         self.component_to_id: dict[Component, str] = {}
+        self._components_frozen: Optional[frozenset] = None
+        self._bu_initialized = False
+        self._dr_initialized = False
 
         self.settings_save_dir = settings_save_dir
-        os.makedirs(self.settings_save_dir, exist_ok=True)
 
     def init_browser_use_agent(self) -> None:
         """
         init browser use agent
         """
+        # Idempotent so a manager reused across UI rebuilds keeps its live browser and agent
+        if self._bu_initialized:
+            return
+        self._bu_initialized = True
         self.bu_agent: Optional[Agent] = None
         self.bu_browser: Optional[CustomBrowser] = None
         self.bu_browser_context: Optional[CustomBrowserContext] = None
@@ -39,15 +49,21 @@ class WebuiManager:
         self.bu_user_help_response: Optional[str] = None
         self.bu_current_task: Optional[asyncio.Task] = None
         self.bu_agent_task_id: Optional[str] = None
+        self.bu_components: Optional[SimpleNamespace] = None
 
     def init_deep_research_agent(self) -> None:
         """
         init deep research agent
         """
-        self.dr_agent: Optional[DeepResearchAgent] = None
+        # Idempotent so a run in progress keeps the agent and lock it started with
+        if self._dr_initialized:
+            return
+        self._dr_initialized = True
+        self.dr_agent: Optional["DeepResearchAgent"] = None
         self.dr_current_task = None
-        self.dr_agent_task_id: Optional[str] = None
+        self.dr_task_id: Optional[str] = None
         self.dr_save_dir: Optional[str] = None
+        self.dr_lock = asyncio.Lock()
 
     def add_components(self, tab_name: str, components_dict: dict[str, "Component"]) -> None:
         """
@@ -55,8 +71,13 @@ class WebuiManager:
         """
         for comp_name, component in components_dict.items():
             comp_id = f"{tab_name}.{comp_name}"
+            # Drop the component this id pointed to in a previous build of the UI
+            old_component = self.id_to_component.get(comp_id)
+            if old_component is not None:
+                self.component_to_id.pop(old_component, None)
             self.id_to_component[comp_id] = component
             self.component_to_id[component] = comp_id
+        self._components_frozen = None
 
     def get_components(self) -> list["Component"]:
         """
@@ -64,6 +85,14 @@ class WebuiManager:
         """
         return list(self.id_to_component.values())
 
+    def get_components_frozen(self) -> frozenset:
+        """
+        Get all components as a frozenset, rebuilt only after components are added
+        """
+        if self._components_frozen is None:
+            self._components_frozen = frozenset(self.id_to_component.values())
+        return self._components_frozen
+
     def get_component_by_id(self, comp_id: str) -> "Component":
         """
         Get component by id
@@ -88,6 +117,7 @@ class WebuiManager:
                 cur_settings[comp_id] = components[comp]
 
         config_name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        os.makedirs(self.settings_save_dir, exist_ok=True)
         with open(os.path.join(self.settings_save_dir, f"{config_name}.json"), "w") as fw:
             json.dump(cur_settings, fw, indent=4)
 